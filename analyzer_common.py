@@ -0,0 +1,196 @@
+"""
+Helpers shared by personal_finance_analyzer.py and time_tracking_analyzer.py.
+"""
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg') # Charts are only written to files, so never start a GUI backend
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from pathlib import Path
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError: # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+DEFAULT_DATE_FORMAT = '%Y-%m-%d'
+DEFAULT_CHUNKSIZE = 1_000_000
+CHART_DPI = 100
+# The strings pd.read_csv treats as missing by default
+CSV_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+def read_csv(csv_path, chunksize=None, columns=None, string_columns=()):
+    """
+    Reads a CSV file, printing an error and returning None if it cannot be read.
+
+    Uses pyarrow's multithreaded parser when it is available, falling back to
+    pandas' default parser if pyarrow is not installed or rejects the file.
+
+    Args:
+        csv_path (str): The path to the CSV file.
+        chunksize (int, optional): If given, return an iterator of DataFrames with at
+            most this many rows each instead of reading the whole file. Chunked reads
+            always use pandas' default parser, as pyarrow does not support them.
+        columns (set, optional): If given, only the columns of the file named in this
+            set are parsed; the others are skipped while reading.
+        string_columns (set): Columns pyarrow should read as strings rather than
+            infer a type for, as pandas' default parser does.
+
+    Returns:
+        pandas.DataFrame or pandas.io.parsers.TextFileReader: The data, or None on error.
+    """
+    try:
+        usecols = None
+        if columns is not None:
+            # Select from the header, as neither parser allows listing absent columns
+            usecols = [col for col in pd.read_csv(csv_path, nrows=0).columns if col in columns] or None
+        if chunksize:
+            return pd.read_csv(csv_path, chunksize=chunksize, usecols=usecols)
+        try:
+            return read_csv_pyarrow(csv_path, usecols, string_columns)
+        except (ImportError, ValueError): # pyarrow's ArrowInvalid is a ValueError
+            return pd.read_csv(csv_path, usecols=usecols)
+    except FileNotFoundError:
+        print(f"Error: File not found at {csv_path}")
+        return None
+    except pd.errors.EmptyDataError:
+        print(f"Error: CSV file at {csv_path} is empty.")
+        return None
+    except Exception as e:
+        print(f"Error reading CSV file at {csv_path}: {e}")
+        return None
+
+def read_csv_pyarrow(csv_path, usecols=None, string_columns=()):
+    """
+    Reads a whole CSV file with pyarrow, with the same missing values as pd.read_csv.
+
+    Args:
+        csv_path (str): The path to the CSV file.
+        usecols (list, optional): The columns to parse; by default all of them.
+        string_columns (set): Columns to read as strings rather than infer a type for.
+
+    Returns:
+        pandas.DataFrame: The data.
+    """
+    import pyarrow
+    from pyarrow import csv as pyarrow_csv
+
+    convert_options = pyarrow_csv.ConvertOptions(
+        column_types={col: pyarrow.string() for col in string_columns},
+        include_columns=usecols or [],
+        null_values=CSV_NA_VALUES,
+        strings_can_be_null=True,
+    )
+    return pyarrow_csv.read_csv(csv_path, convert_options=convert_options).to_pandas()
+
+def parse_dates(dates, date_format=DEFAULT_DATE_FORMAT, fallback=True):
+    """
+    Parses a column of date strings, using an explicit format for speed.
+
+    If more than half of the values do not match the format, the column is
+    re-parsed with pandas' format inference instead.
+
+    Args:
+        dates (pandas.Series): The raw date values.
+        date_format (str): The strftime-style format of the dates, or None to
+            always use pandas' format inference.
+        fallback (bool): Whether to fall back to format inference when most values
+            do not match date_format.
+
+    Returns:
+        pandas.Series: The parsed dates, with NaT for values that could not be parsed.
+    """
+    if date_format is None:
+        return pd.to_datetime(dates, errors='coerce')
+    parsed = pd.to_datetime(dates, format=date_format, errors='coerce', cache=True)
+    if fallback and parsed.isna().mean() > 0.5:
+        parsed = pd.to_datetime(dates, errors='coerce')
+    return parsed
+
+def resolve_date_format(dates, date_format=DEFAULT_DATE_FORMAT):
+    """
+    Returns date_format if most dates match it, otherwise the format guessed from
+    the first non-missing date, or None if no format can be guessed.
+    """
+    if date_format is not None and parse_dates(dates, date_format, fallback=False).isna().mean() <= 0.5:
+        return date_format
+    first_date = dates.dropna().iloc[:1]
+    if first_date.empty or not isinstance(first_date.iloc[0], str):
+        return None
+    return guess_datetime_format(first_date.iloc[0])
+
+def local_datetime64(dates):
+    """
+    Returns parsed dates as a numpy datetime64 array of local wall-clock times.
+    """
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy()
+
+def new_figure(figsize):
+    """
+    Creates a standalone Agg-backed figure, bypassing pyplot's global figure manager.
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def cache_path_for(csv_path):
+    """
+    Returns the path of the parquet cache for csv_path: '<csv file name>.cache.parquet'.
+    """
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + '.cache.parquet')
+
+def read_parquet_cache(csv_path, date_format=DEFAULT_DATE_FORMAT, columns=()):
+    """
+    Returns the parsed data cached next to csv_path, or None if there is no usable cache.
+
+    The cache is only used if it was written from a CSV file of the same size and
+    modification time, with the same date_format and at least the requested columns.
+    """
+    cache_path = cache_path_for(csv_path)
+    try:
+        csv_stat = Path(csv_path).stat()
+        df = pd.read_parquet(cache_path, engine='pyarrow')
+    except Exception: # Missing cache or CSV, no parquet engine, or unreadable file
+        return None
+    if df.attrs.get('csv_size') != csv_stat.st_size or df.attrs.get('csv_mtime_ns') != csv_stat.st_mtime_ns:
+        return None
+    if df.attrs.get('date_format') != date_format:
+        return None
+    if not set(columns) <= set(df.attrs.get('columns', ())):
+        return None
+    print(f"Note: Using cached data from {cache_path}. Pass --no_cache to re-read the CSV file.")
+    return df
+
+def write_parquet_cache(df, csv_path, date_format=DEFAULT_DATE_FORMAT, columns=()):
+    """
+    Saves parsed data next to csv_path so later runs can skip CSV parsing.
+
+    Does nothing if pyarrow is not installed or the file cannot be written.
+    """
+    try:
+        csv_stat = Path(csv_path).stat()
+        df.attrs['csv_size'] = csv_stat.st_size
+        df.attrs['csv_mtime_ns'] = csv_stat.st_mtime_ns
+        df.attrs['date_format'] = date_format
+        df.attrs['columns'] = sorted(columns)
+        df.to_parquet(cache_path_for(csv_path), engine='pyarrow', compression='snappy')
+    except Exception:
+        pass
+
+def add_running_totals(running_totals, chunk_totals):
+    """
+    Adds one chunk's per-key totals (a Series or DataFrame) to the running totals,
+    which are None before the first chunk, keeping integer totals as integers.
+    """
+    if running_totals is None:
+        return chunk_totals
+    totals = running_totals.add(chunk_totals, fill_value=0)
+    if isinstance(totals, pd.Series):
+        return totals.astype(np.result_type(running_totals.dtype, chunk_totals.dtype))
+    return totals.astype({col: np.result_type(running_totals[col].dtype, chunk_totals[col].dtype) for col in totals.columns})
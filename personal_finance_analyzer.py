@@ -1,40 +1,88 @@
+import re
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from analyzer_common import (
+    DEFAULT_DATE_FORMAT, DEFAULT_CHUNKSIZE, CHART_DPI,
+    read_csv, parse_dates, resolve_date_format, local_datetime64, new_figure,
+    read_parquet_cache, write_parquet_cache, add_running_totals,
+)
+
+# The only columns the analyses use; any others in the CSV are not parsed
+FINANCE_COLUMNS = {'Date', 'Description', 'Amount', 'Type', 'Category'}
+# Read as strings, leaving 'Date' for parse_dates to convert
+FINANCE_STRING_COLUMNS = FINANCE_COLUMNS - {'Amount'}
+
+def run_chart_job(executor, save_chart, *args):
+    """
+    Renders a chart with save_chart(*args), in a worker process if an executor is given.
+
+    save_chart returns a status message rather than printing it, so messages from
+    worker processes do not interleave with the main process's output.
 
-def load_finance_data(csv_path):
+    Returns:
+        concurrent.futures.Future: The pending job, whose result is the status message,
+        or None if there is no executor and the chart was rendered and reported here.
+    """
+    if executor is None:
+        print(save_chart(*args))
+        return None
+    return executor.submit(save_chart, *args)
+
+def load_finance_data(csv_path, date_format=DEFAULT_DATE_FORMAT, use_cache=True):
     """
     Loads financial data from a CSV file.
 
     Args:
         csv_path (str): The path to the CSV file.
+        date_format (str): The strftime-style format of the 'Date' column.
+        use_cache (bool): Whether to reuse and update a parquet cache of the parsed data.
 
     Returns:
         pandas.DataFrame: The loaded data as a DataFrame.
     """
-    try:
-        df = pd.read_csv(csv_path)
-    except FileNotFoundError:
-        print(f"Error: File not found at {csv_path}")
-        return None
-    except pd.errors.EmptyDataError:
-        print(f"Error: CSV file at {csv_path} is empty.")
-        return None
-    except Exception as e:
-        print(f"Error reading CSV file at {csv_path}: {e}")
+    if use_cache:
+        df = read_parquet_cache(csv_path, date_format, FINANCE_COLUMNS)
+        if df is not None:
+            return df
+
+    df = read_csv(csv_path, columns=FINANCE_COLUMNS, string_columns=FINANCE_STRING_COLUMNS)
+    if df is None:
         return None
 
+    df = clean_finance_data(df, date_format)
+    if df is not None and use_cache:
+        write_parquet_cache(df, csv_path, date_format, FINANCE_COLUMNS)
+    return df
+
+def clean_finance_data(df, date_format=DEFAULT_DATE_FORMAT, date_fallback=True):
+    """
+    Validates the required columns and converts 'Date' and 'Amount' to proper types.
+
+    Args:
+        df (pandas.DataFrame): The raw data, as read from the CSV file.
+        date_format (str): The strftime-style format of the 'Date' column.
+        date_fallback (bool): Whether to fall back to date format inference (see parse_dates).
+
+    Returns:
+        pandas.DataFrame: The cleaned data, or None if required columns are missing.
+    """
     required_cols = ['Date', 'Description', 'Amount']
     missing_cols = [col for col in required_cols if col not in df.columns]
     if missing_cols:
         print(f"Error: Missing required columns: {', '.join(missing_cols)}")
         return None
 
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    df['Date'] = parse_dates(df['Date'], date_format, fallback=date_fallback)
     df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce').fillna(0)
 
-    # Drop rows where Date could not be parsed
-    df.dropna(subset=['Date'], inplace=True)
+    # Drop rows where Date could not be parsed, skipping the copy when every row is valid
+    valid_rows = df['Date'].notna()
+    if not valid_rows.all():
+        df = df.loc[valid_rows]
 
     return df
 
@@ -51,12 +99,26 @@ def calculate_summary_stats(df):
         # total_expenses = expenses_df['Amount'].sum() # Assuming expenses are positive in this case
         # For now, we'll stick to the single 'Amount' column logic
         print("Note: 'Type' column detected. Current version uses positive/negative 'Amount' for income/expense. Future versions could adapt.")
-        total_income = df[df['Amount'] > 0]['Amount'].sum()
-        total_expenses = df[df['Amount'] < 0]['Amount'].sum() * -1 # Make expenses positive
-    else:
-        total_income = df[df['Amount'] > 0]['Amount'].sum()
-        total_expenses = df[df['Amount'] < 0]['Amount'].sum() * -1 # Make expenses positive
 
+    total_income, total_expenses = summarize_amounts(df)
+    print_summary_stats(total_income, total_expenses)
+
+def summarize_amounts(df):
+    """
+    Returns (total_income, total_expenses), with expenses as a positive number.
+    """
+    # One pass for the signed total and one for the positive part, instead of
+    # two boolean masks and two filtered copies of the column
+    amounts = df['Amount'].to_numpy()
+    net_total = amounts.sum()
+    total_income = amounts.clip(min=0).sum()
+    total_expenses = total_income - net_total # Make expenses positive
+    return total_income, total_expenses
+
+def print_summary_stats(total_income, total_expenses):
+    """
+    Prints summary financial statistics from precomputed totals.
+    """
     net_savings = total_income - total_expenses
 
     print("\n--- Summary Statistics ---")
@@ -79,21 +141,65 @@ KEYWORD_CATEGORIES = {
     'Income': ['salary', 'deposit', 'paycheck'] # To exclude from expense categorization
 }
 
-def infer_category(description, amount):
-    """Helper function to infer category based on description keywords."""
-    if amount > 0: # Skip categorization for income
-        return 'Income'
-    description_lower = str(description).lower()
-    for category, keywords in KEYWORD_CATEGORIES.items():
-        if any(keyword in description_lower for keyword in keywords):
-            if category == 'Income': # Ensure income keywords are only for positive amounts
-                return 'Income' if amount > 0 else 'Miscellaneous Expense'
-            return category
-    return 'Miscellaneous Expense'
+# Category lookup tables, built once at import as parallel arrays indexed by category id:
+# CATEGORY_PATTERNS[i] matches the keywords of CATEGORY_NAMES[i], compiled into a single
+# pattern so a description is scanned once per category instead of once per keyword.
+# Keywords are lowercase and descriptions are lowercased before matching.
+# Ids follow the dict order, and the first matching category wins.
+# Only expenses are categorized, so 'Income' keywords are left out entirely.
+EXPENSE_KEYWORD_CATEGORIES = {category: keywords for category, keywords in KEYWORD_CATEGORIES.items() if category != 'Income'}
+CATEGORY_NAMES = list(EXPENSE_KEYWORD_CATEGORIES) + ['Miscellaneous Expense']
+CATEGORY_PATTERNS = [
+    re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+    for keywords in EXPENSE_KEYWORD_CATEGORIES.values()
+]
+MISC_CATEGORY_ID = CATEGORY_NAMES.index('Miscellaneous Expense')
+# Inferred categories are returned in name order, so grouping on them orders them as
+# grouping on the plain names does; CATEGORY_NAME_ORDER[i] is CATEGORY_NAMES[i]'s position
+SORTED_CATEGORY_NAMES = sorted(CATEGORY_NAMES)
+CATEGORY_NAME_ORDER = np.array([SORTED_CATEGORY_NAMES.index(name) for name in CATEGORY_NAMES], dtype=np.int8)
+
+def infer_categories(descriptions_lower):
+    """
+    Infers an expense category for each description from its keywords.
+
+    Categories are tried in CATEGORY_NAMES order and the first whose keywords
+    appear in a description wins; descriptions matching none, or missing, are
+    'Miscellaneous Expense'.
+
+    Args:
+        descriptions_lower (pandas.Series): Lowercased expense descriptions.
 
-def analyze_spending_by_category(df, category_col='Category'):
+    Returns:
+        pandas.Categorical: The inferred category for each description, stored as
+        small integer codes into SORTED_CATEGORY_NAMES.
+    """
+    # Ledgers repeat the same descriptions (rent, a regular shop) many times, so each
+    # distinct description is scanned once and its category broadcast back to the rows
+    row_codes, unique_descriptions = pd.factorize(descriptions_lower)
+    unique_descriptions = pd.Series(unique_descriptions)
+
+    # One extra trailing slot, never matched, so the -1 code pandas gives missing
+    # descriptions indexes it and they fall through to Miscellaneous Expense
+    unique_codes = np.full(len(unique_descriptions) + 1, MISC_CATEGORY_ID, dtype=np.int8)
+
+    # Try categories in order, scanning only the descriptions no earlier category
+    # matched, so each description stops being searched at its first match
+    unmatched = np.arange(len(unique_descriptions))
+    for category_id, pattern in enumerate(CATEGORY_PATTERNS):
+        if len(unmatched) == 0:
+            break
+        matched = unique_descriptions.iloc[unmatched].str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+        unique_codes[unmatched[matched]] = category_id
+        unmatched = unmatched[~matched]
+    return pd.Categorical.from_codes(CATEGORY_NAME_ORDER[unique_codes][row_codes], categories=SORTED_CATEGORY_NAMES)
+
+def analyze_spending_by_category(df, category_col='Category', executor=None):
     """
     Analyzes spending by category and generates a bar chart.
+
+    If an executor is given, the chart is rendered there and the pending job is
+    returned (see run_chart_job).
     """
     if df is None or df.empty:
         print("No data available for category analysis.")
@@ -104,29 +210,12 @@ def analyze_spending_by_category(df, category_col='Category'):
         print("No expense data available for category analysis.")
         return
 
-    # Determine which category column to use
-    use_inferred_category = False
-    cat_col_to_use = category_col
-
-    if category_col not in expenses_df.columns or expenses_df[category_col].isnull().sum() > 0.7 * len(expenses_df):
+    expenses_df, cat_col_to_use, use_inferred_category = categorize_expenses(expenses_df, category_col)
+    if use_inferred_category:
         print(f"'{category_col}' column is missing or largely empty. Attempting to infer categories from 'Description'.")
-        expenses_df['InferredCategory'] = expenses_df.apply(lambda row: infer_category(row['Description'], row['Amount']), axis=1)
-        expenses_df = expenses_df[expenses_df['InferredCategory'] != 'Income'] # Ensure income is not treated as expense category
-        cat_col_to_use = 'InferredCategory'
-        if expenses_df[cat_col_to_use].nunique() == 0 or \
-           (expenses_df[cat_col_to_use].nunique() == 1 and expenses_df[cat_col_to_use].iloc[0] == 'Miscellaneous Expense'):
-            print("Could not infer meaningful categories from descriptions for expense analysis.")
-            # Optionally, could proceed without category breakdown or return
-            # For now, let's print a message and proceed if there's any data.
+        if expenses_df[cat_col_to_use].nunique() == 1 and expenses_df[cat_col_to_use].iloc[0] == 'Miscellaneous Expense':
             # If 'Miscellaneous Expense' is the only one, it will be plotted.
-            if expenses_df[cat_col_to_use].nunique() == 0 :
-                 print("No categories found or inferred for spending analysis.")
-                 return
-        use_inferred_category = True
-    else:
-        # Exclude 'Income' category from expense analysis if it exists in the original category column
-        if 'income' in expenses_df[cat_col_to_use].str.lower().unique():
-            expenses_df = expenses_df[~expenses_df[cat_col_to_use].str.lower().isin(['income'])]
+            print("Could not infer meaningful categories from descriptions for expense analysis.")
 
     if cat_col_to_use not in expenses_df.columns:
         print(f"Error: Category column '{cat_col_to_use}' not found for analysis after inference/selection process.")
@@ -136,9 +225,76 @@ def analyze_spending_by_category(df, category_col='Category'):
         print(f"No expense data available for category '{cat_col_to_use}' analysis after filtering.")
         return
 
-    # Calculate spending: make amounts positive for summing expenses
-    spending_by_cat = expenses_df.groupby(cat_col_to_use)['Amount'].sum().abs().sort_values(ascending=False)
+    # Calculate spending: make amounts positive for summing expenses.
+    # Groups come out in name order, which is how categories with equal spending stay ordered
+    spending_by_cat = expenses_df.groupby(cat_col_to_use, observed=True, sort=True)['Amount'].sum().abs().sort_values(ascending=False)
+    return report_spending_by_category(spending_by_cat, use_inferred_category, executor)
 
+def categorize_expenses(expenses_df, category_col='Category'):
+    """
+    Chooses the category column for expense analysis, inferring categories if needed.
+
+    If category_col is missing or more than 70% empty, categories are inferred from
+    'Description' into an 'InferredCategory' column. Otherwise rows categorized as
+    income are dropped.
+
+    Args:
+        expenses_df (pandas.DataFrame): Expense rows only (Amount < 0).
+        category_col (str): The name of the provided category column.
+
+    Returns:
+        tuple: (expenses_df, cat_col_to_use, use_inferred_category)
+    """
+    if should_infer_categories(count_missing_categories(expenses_df, category_col), len(expenses_df)):
+        return infer_expense_categories(expenses_df), 'InferredCategory', True
+    return exclude_income_categories(expenses_df, category_col), category_col, False
+
+def count_missing_categories(expenses_df, category_col='Category'):
+    """
+    Returns how many expense rows have no category_col value (all of them if the column is missing).
+    """
+    if category_col not in expenses_df.columns:
+        return len(expenses_df)
+    return int(expenses_df[category_col].isnull().sum())
+
+def should_infer_categories(missing_count, row_count):
+    """
+    Returns whether categories should be inferred: when more than 70% of expense rows have none.
+    """
+    return missing_count > 0.7 * row_count
+
+def infer_expense_categories(expenses_df):
+    """
+    Adds an 'InferredCategory' column inferred from 'Description' and returns the frame.
+    """
+    # Lowercase the whole column in one pass rather than once per row
+    descriptions_lower = expenses_df['Description'].astype(str).str.lower()
+    expenses_df['InferredCategory'] = infer_categories(descriptions_lower)
+    return expenses_df
+
+def exclude_income_categories(expenses_df, category_col='Category'):
+    """
+    Returns the expense rows whose provided category is not 'Income'.
+    """
+    # Exclude 'Income' category from expense analysis if it exists in the original category column
+    # One lowercase pass builds the mask; rows are only copied if there is something to drop
+    is_income = expenses_df[category_col].str.lower().eq('income')
+    if is_income.any():
+        expenses_df = expenses_df.loc[~is_income]
+    return expenses_df
+
+def report_spending_by_category(spending_by_cat, use_inferred_category=False, executor=None):
+    """
+    Prints spending per category and saves it as a bar chart.
+
+    Args:
+        spending_by_cat (pandas.Series): Total (positive) spending indexed by category.
+        use_inferred_category (bool): Whether the categories were inferred from descriptions.
+        executor (concurrent.futures.Executor, optional): Where to render the chart.
+
+    Returns:
+        concurrent.futures.Future: The pending chart job, or None (see run_chart_job).
+    """
     print("\n--- Spending By Category ---")
     if use_inferred_category:
         print("(Categories were inferred from descriptions)")
@@ -147,47 +303,87 @@ def analyze_spending_by_category(df, category_col='Category'):
 
     # Generate and save bar chart
     if not spending_by_cat.empty:
-        plt.figure(figsize=(10, 7))
-        spending_by_cat.plot(kind='bar', color='skyblue')
-        plt.title(f'Spending by {"Inferred " if use_inferred_category else ""}Category')
-        plt.xlabel('Category')
-        plt.ylabel('Total Spending ($)')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        try:
-            plt.savefig('spending_by_category.png')
-            print("Bar chart 'spending_by_category.png' saved successfully.")
-        except Exception as e:
-            print(f"Error saving spending by category chart: {e}")
-        plt.close()
-    else:
-        print("No data to plot for spending by category.")
+        return run_chart_job(executor, save_spending_by_category_chart, spending_by_cat, use_inferred_category)
+    print("No data to plot for spending by category.")
+    return None
+
+def save_spending_by_category_chart(spending_by_cat, use_inferred_category=False):
+    """
+    Saves spending per category as a bar chart and returns a status message.
+    """
+    fig = new_figure((10, 7))
+    ax = fig.subplots()
+    spending_by_cat.plot(kind='bar', color='skyblue', ax=ax)
+    ax.set_title(f'Spending by {"Inferred " if use_inferred_category else ""}Category')
+    ax.set_xlabel('Category')
+    ax.set_ylabel('Total Spending ($)')
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha='right')
+    fig.tight_layout()
+    try:
+        fig.savefig('spending_by_category.png', dpi=CHART_DPI)
+        return "Bar chart 'spending_by_category.png' saved successfully."
+    except Exception as e:
+        return f"Error saving spending by category chart: {e}"
 
 
-def analyze_monthly_trends(df):
+def analyze_monthly_trends(df, executor=None):
     """
     Analyzes monthly financial trends and generates line charts.
+
+    If an executor is given, the charts are rendered there and the pending job is
+    returned (see run_chart_job).
     """
     if df is None or df.empty:
         print("No data available for monthly trend analysis.")
-        return
+        return None
+
+    return report_monthly_trends(monthly_totals(df), executor)
 
-    monthly_df = df.copy()
-    monthly_df['YearMonth'] = monthly_df['Date'].dt.to_period('M')
+def monthly_totals(df):
+    """
+    Sums income and expenses per month.
+
+    Returns:
+        pandas.DataFrame: 'TotalIncome' and 'TotalExpenses' (as positive values),
+        indexed by 'YearMonth' (the first day of each month).
+    """
+    amounts = df['Amount'].to_numpy()
+    # Truncating to datetime64[M] gives int64-backed keys, which group on pandas'
+    # fast hash path instead of the slower Period path of dt.to_period('M')
+    year_month = local_datetime64(df['Date']).astype('datetime64[M]')
+
+    # Separate income and expenses (expenses as positive values), zero elsewhere
+    monthly_summary = pd.DataFrame({
+        'TotalIncome': amounts_where(amounts > 0, amounts),
+        'TotalExpenses': amounts_where(amounts < 0, -amounts),
+    }).groupby(year_month).sum()
+    monthly_summary.index.name = 'YearMonth'
+    return monthly_summary
+
+def amounts_where(mask, amounts):
+    """
+    Returns amounts where mask is set and zero elsewhere, as floats unless every row is set.
+    """
+    if mask.all():
+        return amounts
+    return np.where(mask, amounts, 0.0)
 
-    # Separate income and expenses
-    monthly_df['Income'] = monthly_df[monthly_df['Amount'] > 0]['Amount']
-    monthly_df['Expenses'] = monthly_df[monthly_df['Amount'] < 0]['Amount'].abs() # Expenses as positive values
+def report_monthly_trends(monthly_totals_df, executor=None):
+    """
+    Prints monthly income, expenses and net savings and saves them as line charts.
 
-    # Group by YearMonth and sum income and expenses
-    monthly_summary = monthly_df.groupby('YearMonth').agg(
-        TotalIncome=('Income', 'sum'),
-        TotalExpenses=('Expenses', 'sum')
-    ).reset_index()
+    Args:
+        monthly_totals_df (pandas.DataFrame): Monthly totals, as returned by monthly_totals.
+        executor (concurrent.futures.Executor, optional): Where to render the charts.
 
+    Returns:
+        concurrent.futures.Future: The pending chart job, or None (see run_chart_job).
+    """
+    monthly_summary = monthly_totals_df.reset_index()
     monthly_summary['NetSavings'] = monthly_summary['TotalIncome'] - monthly_summary['TotalExpenses']
-    # Convert Period to string for printing and plotting if necessary, or use as Period object
-    monthly_summary['YearMonth'] = monthly_summary['YearMonth'].astype(str)
+    # Convert to 'YYYY-MM' strings for printing and plotting
+    monthly_summary['YearMonth'] = monthly_summary['YearMonth'].dt.strftime('%Y-%m')
 
 
     print("\n--- Monthly Trends ---")
@@ -196,42 +392,122 @@ def analyze_monthly_trends(df):
 
     # Generate and save line charts
     if not monthly_summary.empty:
-        plt.figure(figsize=(12, 8))
-
-        plt.subplot(3, 1, 1) # 3 rows, 1 column, 1st subplot
-        plt.plot(monthly_summary['YearMonth'], monthly_summary['TotalIncome'], marker='o', color='green', label='Total Income')
-        plt.title('Monthly Income')
-        plt.ylabel('Amount ($)')
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(True)
-        plt.legend()
-
-        plt.subplot(3, 1, 2) # 3 rows, 1 column, 2nd subplot
-        plt.plot(monthly_summary['YearMonth'], monthly_summary['TotalExpenses'], marker='o', color='red', label='Total Expenses')
-        plt.title('Monthly Expenses')
-        plt.ylabel('Amount ($)')
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(True)
-        plt.legend()
-
-        plt.subplot(3, 1, 3) # 3 rows, 1 column, 3rd subplot
-        plt.plot(monthly_summary['YearMonth'], monthly_summary['NetSavings'], marker='o', color='blue', label='Net Savings')
-        plt.title('Monthly Net Savings')
-        plt.xlabel('Year-Month')
-        plt.ylabel('Amount ($)')
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(True)
-        plt.legend()
-
-        plt.tight_layout()
-        try:
-            plt.savefig('monthly_trends.png')
-            print("Line chart 'monthly_trends.png' saved successfully.")
-        except Exception as e:
-            print(f"Error saving monthly trends chart: {e}")
-        plt.close()
+        return run_chart_job(executor, save_monthly_trends_chart, monthly_summary)
+    print("No data to plot for monthly trends.")
+    return None
+
+def save_monthly_trends_chart(monthly_summary):
+    """
+    Saves monthly income, expenses and net savings as line charts and returns a status message.
+    """
+    x = monthly_summary['YearMonth']
+    fig = new_figure((12, 8))
+    axes = fig.subplots(3, 1, sharex=True) # 3 rows, 1 column, shared month axis
+    subplot_specs = [
+        ('TotalIncome', 'green', 'Total Income', 'Monthly Income'),
+        ('TotalExpenses', 'red', 'Total Expenses', 'Monthly Expenses'),
+        ('NetSavings', 'blue', 'Net Savings', 'Monthly Net Savings'),
+    ]
+    for ax, (col, color, label, title) in zip(axes, subplot_specs):
+        ax.plot(x, monthly_summary[col], marker='o', color=color, label=label)
+        ax.set_title(title)
+        ax.set_ylabel('Amount ($)')
+        ax.grid(True)
+        ax.legend()
+    axes[-1].set_xlabel('Year-Month')
+    # Month labels are laid out once, on the bottom subplot only
+    fig.autofmt_xdate(rotation=45, ha='right')
+
+    fig.tight_layout()
+    try:
+        fig.savefig('monthly_trends.png', dpi=CHART_DPI)
+        return "Line chart 'monthly_trends.png' saved successfully."
+    except Exception as e:
+        return f"Error saving monthly trends chart: {e}"
+
+
+def stream_analyze(csv_path, chunksize=DEFAULT_CHUNKSIZE, date_format=DEFAULT_DATE_FORMAT, category_col='Category'):
+    """
+    Runs the full analysis on a CSV file read in chunks of at most `chunksize` rows.
+
+    Peak memory is bounded by the chunk size rather than the file size: summary
+    totals, monthly totals and per-category spending are accumulated chunk by chunk
+    and reported once at the end. The date format is decided once, from the first
+    chunk (see resolve_date_format). Spending is accumulated both by the provided
+    categories and by inferred ones, and whether to report the inferred categories
+    is decided once over the whole file, using the same rule as
+    analyze_spending_by_category, so the result does not depend on the chunk size.
+
+    Returns:
+        bool: False if the file could not be read or validated, True otherwise.
+    """
+    reader = read_csv(csv_path, chunksize=chunksize, columns=FINANCE_COLUMNS)
+    if reader is None:
+        return False
+
+    total_income = total_expenses = 0.0
+    monthly_summary = None
+    provided_spending = inferred_spending = None
+    expense_rows = missing_categories = 0
+    type_col_seen = False
+
+    date_format_resolved = False
+
+    with reader:
+        for chunk in reader:
+            if not date_format_resolved and 'Date' in chunk.columns:
+                date_format = resolve_date_format(chunk['Date'], date_format)
+                date_format_resolved = True
+            chunk = clean_finance_data(chunk, date_format, date_fallback=False)
+            if chunk is None:
+                return False
+            if chunk.empty:
+                continue
+            type_col_seen = type_col_seen or 'Type' in chunk.columns
+
+            chunk_income, chunk_expenses = summarize_amounts(chunk)
+            total_income += chunk_income
+            total_expenses += chunk_expenses
+
+            chunk_monthly = monthly_totals(chunk)
+            monthly_summary = add_running_totals(monthly_summary, chunk_monthly)
+
+            expenses_df = chunk[chunk['Amount'] < 0].copy()
+            if expenses_df.empty:
+                continue
+            chunk_missing = count_missing_categories(expenses_df, category_col)
+            expense_rows += len(expenses_df)
+            missing_categories += chunk_missing
+
+            expenses_df = infer_expense_categories(expenses_df)
+            chunk_spending = expenses_df.groupby('InferredCategory', observed=True)['Amount'].sum()
+            inferred_spending = add_running_totals(inferred_spending, chunk_spending)
+            if chunk_missing < len(expenses_df): # A chunk with no categories at all has nothing to add
+                expenses_df = exclude_income_categories(expenses_df, category_col)
+                chunk_spending = expenses_df.groupby(category_col, observed=True)['Amount'].sum()
+                provided_spending = add_running_totals(provided_spending, chunk_spending)
+
+    if monthly_summary is None:
+        print("No valid data found in the file.")
+        return False
+
+    if type_col_seen:
+        print("Note: 'Type' column detected. Current version uses positive/negative 'Amount' for income/expense. Future versions could adapt.")
+    print_summary_stats(total_income, total_expenses)
+
+    use_inferred_category = should_infer_categories(missing_categories, expense_rows)
+    spending_by_cat = inferred_spending if use_inferred_category else provided_spending
+    if spending_by_cat is None or spending_by_cat.empty:
+        print("No expense data available for category analysis.")
     else:
-        print("No data to plot for monthly trends.")
+        if use_inferred_category:
+            print(f"'{category_col}' column is missing or largely empty. Categories were inferred from 'Description'.")
+            if spending_by_cat.index.tolist() == ['Miscellaneous Expense']:
+                print("Could not infer meaningful categories from descriptions for expense analysis.")
+        report_spending_by_category(spending_by_cat.abs().sort_values(ascending=False), use_inferred_category)
+
+    report_monthly_trends(monthly_summary.sort_index())
+    return True
 
 
 def main():
@@ -240,17 +516,35 @@ def main():
     """
     parser = argparse.ArgumentParser(description="Personal Finance Analyzer")
     parser.add_argument("csv_file", help="Path to the CSV file containing financial data.")
+    parser.add_argument("--date_format", default=DEFAULT_DATE_FORMAT, help="strftime-style format of the 'Date' column. Default: %%Y-%%m-%%d")
+    parser.add_argument("--chunksize", type=int, default=None, help=f"Read the CSV in chunks of this many rows and aggregate incrementally, for files too large to fit in memory (e.g. {DEFAULT_CHUNKSIZE}). Default: read the whole file at once")
+    parser.add_argument("--no_cache", action="store_true", help="Always parse the CSV file, ignoring and not writing the '.cache.parquet' file next to it.")
     args = parser.parse_args()
 
-    df = load_finance_data(args.csv_file)
+    if args.chunksize:
+        if not stream_analyze(args.csv_file, chunksize=args.chunksize, date_format=args.date_format):
+            print("Failed to load or validate financial data. Exiting.")
+        return
+
+    df = load_finance_data(args.csv_file, date_format=args.date_format, use_cache=not args.no_cache)
 
     if df is None:
         print("Failed to load or validate financial data. Exiting.")
         return # Or import sys; sys.exit(1)
 
     calculate_summary_stats(df)
-    analyze_spending_by_category(df) # Default category_col is 'Category'
-    analyze_monthly_trends(df)
+    # The two charts are independent, so render them in worker processes while the
+    # main process carries on with the analysis; report their status once both are done.
+    # On a single CPU the workers would only add overhead, so render in-process there.
+    use_workers = (os.cpu_count() or 1) > 1
+    with (ProcessPoolExecutor(max_workers=2) if use_workers else nullcontext()) as executor:
+        chart_jobs = [
+            analyze_spending_by_category(df, executor=executor), # Default category_col is 'Category'
+            analyze_monthly_trends(df, executor=executor),
+        ]
+        for job in chart_jobs:
+            if job is not None:
+                print(job.result())
 
 if __name__ == "__main__":
     main()
@@ -1,30 +1,79 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import argparse
-
-def load_time_data(csv_path):
+from analyzer_common import (
+    DEFAULT_DATE_FORMAT, DEFAULT_CHUNKSIZE, CHART_DPI,
+    read_csv, parse_dates, resolve_date_format, local_datetime64, new_figure,
+    read_parquet_cache, write_parquet_cache, add_running_totals,
+)
+
+PROJECT_COL_OPTIONS = ['Project', 'Task']
+# Columns always parsed from the CSV; the --group_by column is added to these
+TIME_COLUMNS = {'Date', 'Duration', 'Category', *PROJECT_COL_OPTIONS}
+DURATION_UNITS_NOTE = "Note: Assuming 'Duration' column is in hours. If it's in minutes or other formats, please convert it to hours (numeric) in the CSV."
+
+def load_time_data(csv_path, date_format=DEFAULT_DATE_FORMAT, use_cache=True, group_by=None):
     """
     Loads time tracking data from a CSV file.
 
     Args:
         csv_path (str): The path to the CSV file.
+        date_format (str): The strftime-style format of the 'Date' column.
+        use_cache (bool): Whether to reuse and update a parquet cache of the parsed data.
+        group_by (str, optional): A column to load in addition to TIME_COLUMNS.
 
     Returns:
-        pandas.DataFrame: The loaded data as a DataFrame.
+        pandas.DataFrame: The loaded data as a DataFrame, with 'Date' as datetime64 and
+                          'Duration' as numeric, neither containing missing values.
                           Returns None if essential columns are missing or file not found.
     """
-    try:
-        df = pd.read_csv(csv_path)
-    except FileNotFoundError:
-        print(f"Error: File not found at {csv_path}")
-        return None, None
-    except pd.errors.EmptyDataError:
-        print(f"Error: CSV file at {csv_path} is empty.")
-        return None, None
-    except Exception as e:
-        print(f"Error reading CSV file at {csv_path}: {e}")
+    columns = TIME_COLUMNS | {group_by} if group_by else TIME_COLUMNS
+    df = read_parquet_cache(csv_path, date_format, columns) if use_cache else None
+    if df is not None:
+        project_col_name = find_project_col(df.columns)
+    else:
+        df = read_csv(csv_path, columns=columns, string_columns=columns - {'Duration'})
+        if df is None:
+            return None, None
+
+        df, project_col_name = clean_time_data(df, date_format)
+        if df is None:
+            return None, None
+        if use_cache and not df.empty:
+            write_parquet_cache(df, csv_path, date_format, columns)
+
+    # Assume Duration is a numeric value in hours. Add a note if conversion is needed.
+    print(DURATION_UNITS_NOTE)
+
+    if df.empty:
+        print("No valid data remaining after handling missing values or conversion errors.")
         return None, None
 
+    return df, project_col_name
+
+def find_project_col(columns):
+    """
+    Returns the first of PROJECT_COL_OPTIONS present in columns, or None.
+    """
+    for col_option in PROJECT_COL_OPTIONS:
+        if col_option in columns:
+            return col_option
+    return None
+
+def clean_time_data(df, date_format=DEFAULT_DATE_FORMAT, date_fallback=True):
+    """
+    Validates the required columns and converts 'Date' and 'Duration' to proper types.
+
+    Rows where either conversion failed are dropped, so the result may be empty.
+
+    Args:
+        df (pandas.DataFrame): The raw data, as read from the CSV file.
+        date_format (str): The strftime-style format of the 'Date' column.
+        date_fallback (bool): Whether to fall back to date format inference (see parse_dates).
+
+    Returns:
+        tuple: (DataFrame, project_col_name), or (None, None) if required columns are missing.
+    """
     # Essential columns check
     required_cols = ['Date', 'Duration']
     missing_cols = [col for col in required_cols if col not in df.columns]
@@ -33,28 +82,19 @@ def load_time_data(csv_path):
         return None, None
 
     # Project/Task column detection and validation
-    project_col_options = ['Project', 'Task']
-    project_col_name = None
-    for col_option in project_col_options:
-        if col_option in df.columns:
-            project_col_name = col_option
-            break
-
+    project_col_name = find_project_col(df.columns)
     if not project_col_name:
-        print(f"Error: Missing one of the required project/task columns: {', '.join(project_col_options)}. At least one must be present.")
+        print(f"Error: Missing one of the required project/task columns: {', '.join(PROJECT_COL_OPTIONS)}. At least one must be present.")
         return None, None
 
-    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-    # Assume Duration is a numeric value in hours. Add a note if conversion is needed.
-    print("Note: Assuming 'Duration' column is in hours. If it's in minutes or other formats, please convert it to hours (numeric) in the CSV.")
+    df['Date'] = parse_dates(df['Date'], date_format, fallback=date_fallback)
     df['Duration'] = pd.to_numeric(df['Duration'], errors='coerce')
 
-    # Drop rows where essential conversions failed (Date or Duration)
-    df.dropna(subset=['Date', 'Duration'], inplace=True)
-
-    if df.empty:
-        print("No valid data remaining after handling missing values or conversion errors.")
-        return None, None
+    # Drop rows where essential conversions failed (Date or Duration),
+    # skipping the copy when every row is valid
+    valid_rows = df['Date'].notna() & df['Duration'].notna()
+    if not valid_rows.all():
+        df = df.loc[valid_rows]
 
     return df, project_col_name
 
@@ -95,7 +135,16 @@ def analyze_time_allocation(df, main_group_col):
         return
 
     time_by_group = df.groupby(main_group_col)['Duration'].sum().sort_values(ascending=False)
+    report_time_allocation(time_by_group, main_group_col)
+
+def report_time_allocation(time_by_group, main_group_col):
+    """
+    Prints time allocation per group and saves it as a bar chart.
 
+    Args:
+        time_by_group (pandas.Series): Total duration indexed by group, sorted descending.
+        main_group_col (str): The name of the grouping column.
+    """
     if time_by_group.empty:
         print(f"No time data found for any groups in column '{main_group_col}'.")
         return
@@ -105,44 +154,69 @@ def analyze_time_allocation(df, main_group_col):
     print("---------------------------------------\n")
 
     # Generate and save bar chart
-    plt.figure(figsize=(10, 7))
-    time_by_group.plot(kind='bar', color='coral')
-    plt.title(f'Time Allocation by {main_group_col}')
-    plt.xlabel(main_group_col)
-    plt.ylabel('Total Duration (hours)')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    fig = new_figure((10, 7))
+    ax = fig.subplots()
+    time_by_group.plot(kind='bar', color='coral', ax=ax)
+    ax.set_title(f'Time Allocation by {main_group_col}')
+    ax.set_xlabel(main_group_col)
+    ax.set_ylabel('Total Duration (hours)')
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha='right')
+    fig.tight_layout()
 
     chart_filename = f'time_allocation_by_{main_group_col.lower().replace(" ", "_")}.png'
     try:
-        plt.savefig(chart_filename)
+        fig.savefig(chart_filename, dpi=CHART_DPI)
         print(f"Bar chart '{chart_filename}' saved successfully.")
     except Exception as e:
         print(f"Error saving time allocation chart: {e}")
-    plt.close()
+
+def sum_by_period(dates, durations, period='D'):
+    """
+    Sums durations per day ('D') or per week ('W'), including periods with no entries.
+
+    Gives the same result as resample('D') or resample('W-MON') followed by sum(),
+    where each week ends on, and is labelled by, a Monday.
+
+    Args:
+        dates (pandas.Series): The entry dates, as datetime64.
+        durations (pandas.Series): The duration of each entry.
+        period (str): 'D' for daily or 'W' for weekly totals.
+
+    Returns:
+        pandas.Series: The total duration per period, indexed by period date in the
+        dates' own timezone, if any.
+    """
+    days = local_datetime64(dates).astype('datetime64[D]').astype(np.int64) # Days since 1970-01-01, a Thursday
+    if period == 'W':
+        # Move each date forward to the Monday that ends its week
+        days = days + (-(days + 3)) % 7
+        step, freq = 7, 'W-MON'
+    else:
+        step, freq = 1, 'D'
+
+    first_day = days.min()
+    periods = (days - first_day) // step
+    totals = pd.Series(durations.to_numpy(), name=durations.name).groupby(periods).sum()
+    # Periods with no entries sum to zero, as with resample; integer durations stay integers
+    totals = totals.reindex(np.arange(periods.max() + 1), fill_value=0)
+    totals.index = pd.date_range(start=np.datetime64(int(first_day), 'D'), periods=len(totals), freq=freq, tz=dates.dt.tz, unit=dates.dt.unit, name=dates.name)
+    return totals
 
 def analyze_time_trends(df, period='D'):
     """
     Analyzes daily or weekly time tracking trends and generates a line chart.
+
+    Expects data as returned by load_time_data: 'Date' is already datetime64 with
+    no missing values, so it is not converted again here.
     """
     if df is None or df.empty:
         print("No data available for time trend analysis.")
         return
 
-    trends_df = df.copy()
-    if not pd.api.types.is_datetime64_any_dtype(trends_df['Date']):
-        trends_df['Date'] = pd.to_datetime(trends_df['Date'], errors='coerce')
-        trends_df.dropna(subset=['Date'], inplace=True)
-        if trends_df.empty:
-            print("No valid date data available for trend analysis after conversion.")
-            return
-
-    trends_df.set_index('Date', inplace=True)
+    assert pd.api.types.is_datetime64_any_dtype(df['Date']), "'Date' must be parsed by load_time_data"
 
-    # Resample data
-    # For weekly trends, 'W' defaults to 'W-SUN'. Use 'W-MON' for weeks starting Monday if desired.
-    rule = 'W-MON' if period == 'W' else 'D'
-    time_over_period = trends_df['Duration'].resample(rule).sum()
+    time_over_period = sum_by_period(df['Date'], df['Duration'], period)
 
     if time_over_period.empty:
         print(f"No time data found for the {('Daily' if period == 'D' else 'Weekly')} trend analysis.")
@@ -153,23 +227,77 @@ def analyze_time_trends(df, period='D'):
     print("---------------------------------------------------\n")
 
     # Generate and save line chart
-    plt.figure(figsize=(12, 6))
-    time_over_period.plot(kind='line', marker='o', linestyle='-', color='teal')
+    fig = new_figure((12, 6))
+    ax = fig.subplots()
+    time_over_period.plot(kind='line', marker='o', linestyle='-', color='teal', ax=ax)
     period_name = 'Daily' if period == 'D' else 'Weekly'
-    plt.title(f'{period_name} Time Tracked Over Period')
-    plt.xlabel('Period Start Date' if period == 'W' else 'Date')
-    plt.ylabel('Total Duration (hours)')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(True)
-    plt.tight_layout()
+    ax.set_title(f'{period_name} Time Tracked Over Period')
+    ax.set_xlabel('Period Start Date' if period == 'W' else 'Date')
+    ax.set_ylabel('Total Duration (hours)')
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha='right')
+    ax.grid(True)
+    fig.tight_layout()
 
     chart_filename = f'{period_name.lower()}_time_trend.png'
     try:
-        plt.savefig(chart_filename)
+        fig.savefig(chart_filename, dpi=CHART_DPI)
         print(f"Line chart '{chart_filename}' saved successfully.")
     except Exception as e:
         print(f"Error saving {period_name.lower()} time trend chart: {e}")
-    plt.close()
+
+def stream_analyze(csv_path, group_by='Project', period='D', chunksize=DEFAULT_CHUNKSIZE, date_format=DEFAULT_DATE_FORMAT):
+    """
+    Runs the full analysis on a CSV file read in chunks of at most `chunksize` rows.
+
+    Peak memory is bounded by the chunk size rather than the file size: durations
+    are accumulated per distinct date and per group chunk by chunk, which is all
+    the summary statistics, allocation and trend analyses need. The date format is
+    decided once, from the first chunk (see resolve_date_format).
+
+    Returns:
+        bool: False if the file could not be read or validated, True otherwise.
+    """
+    reader = read_csv(csv_path, chunksize=chunksize, columns=TIME_COLUMNS | {group_by})
+    if reader is None:
+        return False
+
+    group_col = None
+    time_by_date = None
+    time_by_group = None
+
+    date_format_resolved = False
+
+    with reader:
+        for chunk in reader:
+            if not date_format_resolved and 'Date' in chunk.columns:
+                date_format = resolve_date_format(chunk['Date'], date_format)
+                date_format_resolved = True
+            chunk, project_col_name = clean_time_data(chunk, date_format, date_fallback=False)
+            if chunk is None:
+                return False
+            if group_col is None:
+                print(DURATION_UNITS_NOTE)
+                group_col = group_by
+                if group_col not in chunk.columns:
+                    print(f"Warning: Specified group_by column '{group_by}' not found. Defaulting to '{project_col_name}'.")
+                    group_col = project_col_name
+
+            chunk_by_date = chunk.groupby('Date')['Duration'].sum()
+            time_by_date = add_running_totals(time_by_date, chunk_by_date)
+            chunk_by_group = chunk.groupby(group_col)['Duration'].sum()
+            time_by_group = add_running_totals(time_by_group, chunk_by_group)
+
+    if time_by_date is None or time_by_date.empty:
+        print("No valid data remaining after handling missing values or conversion errors.")
+        return False
+
+    # One row per distinct date gives the same totals, date range and day count as the raw entries
+    daily_df = time_by_date.sort_index().rename_axis('Date').reset_index(name='Duration')
+    calculate_summary_stats(daily_df)
+    report_time_allocation(time_by_group.sort_values(ascending=False), group_col)
+    analyze_time_trends(daily_df, period=period)
+    return True
 
 def main():
     """
@@ -179,10 +307,18 @@ def main():
     parser.add_argument("csv_file", help="Path to the CSV file containing time tracking data.")
     parser.add_argument("--group_by", default="Project", help="Column to group by for allocation analysis (e.g., Project, Task, Category). Default: Project")
     parser.add_argument("--trend_period", default="D", choices=['D', 'W'], help="Period for time trend analysis ('D' for daily, 'W' for weekly). Default: D")
+    parser.add_argument("--date_format", default=DEFAULT_DATE_FORMAT, help="strftime-style format of the 'Date' column. Default: %%Y-%%m-%%d")
+    parser.add_argument("--chunksize", type=int, default=None, help=f"Read the CSV in chunks of this many rows and aggregate incrementally, for files too large to fit in memory (e.g. {DEFAULT_CHUNKSIZE}). Default: read the whole file at once")
+    parser.add_argument("--no_cache", action="store_true", help="Always parse the CSV file, ignoring and not writing the '.cache.parquet' file next to it.")
     args = parser.parse_args()
 
+    if args.chunksize:
+        if not stream_analyze(args.csv_file, group_by=args.group_by, period=args.trend_period, chunksize=args.chunksize, date_format=args.date_format):
+            print("Failed to load or validate time data. Exiting.")
+        return
+
     # Pass args.csv_file instead of args.csv_filepath
-    df, project_col_name = load_time_data(args.csv_file)
+    df, project_col_name = load_time_data(args.csv_file, date_format=args.date_format, use_cache=not args.no_cache, group_by=args.group_by)
 
     if df is None:
         print("Failed to load or validate time data. Exiting.")